@@ -2,13 +2,44 @@
 import streamlit as st
 import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import numpy as np
 from datetime import datetime, timedelta
+import hashlib
+import atexit
+import shutil
 import tempfile
 import os
+from pathlib import Path
+
+# Query bounds bind as datetime objects, written in the same text form the
+# database stores so DateTime comparisons stay plain string comparisons
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=' ', timespec='seconds'))
+
+# Schematic color classes by distance from the target temperature (°C)
+TEMP_DIFF_THRESHOLDS = np.array([5, 15])
+TEMP_CLASS_COLORS = np.array(['lightgreen', 'yellow', 'lightcoral'])
+
+# Upper bound on points sent to the browser per plot trace
+MAX_POINTS_PER_TRACE = 2000
+
+# Column types of the bucketed beacon frame: sensor values fit comfortably
+# in float32 and beacon names repeat for every bucket
+BUCKET_DTYPES = {
+    'BeaconDescription': 'category',
+    'ExternalSensorTemperature': 'float32',
+    'ExternalSensorTemperatureExt1': 'float32',
+    'RSSI': 'float32',
+    'MaxTemperature': 'float32',
+    'DataPoints': 'int32',
+    'TempPoints': 'int32',
+    'RssiPoints': 'int32',
+}
+
+# Columns carried into the plotted series
+PLOT_COLUMNS = ['DateTime', 'ExternalSensorTemperature', 'ExternalSensorTemperatureExt1', 'RSSI']
+
+# Beacons drawn at once in the analysis figure
+BEACONS_PER_PAGE = 5
 
 # Page config
 st.set_page_config(
@@ -17,137 +48,377 @@ st.set_page_config(
     layout="wide"
 )
 
-def get_beacons_from_db(db_path):
-    """Get list of available beacons from database"""
-    try:
-        conn = sqlite3.connect(db_path)
-        query = "SELECT DISTINCT beacon.Description FROM Beacon beacon ORDER BY beacon.Description"
-        beacons = pd.read_sql_query(query, conn)
+@st.cache_resource(show_spinner=False)
+def get_open_connections():
+    """Shared connections handed out by get_connection, by database path"""
+    # Streamlit re-executes this module on every rerun, so a module-level
+    # dict would be empty again by the time a copy is deleted
+    return {}
+
+@st.cache_resource(show_spinner=False)
+def get_temp_databases():
+    """Temp database copies still on disk, removed together at server exit"""
+    # Created once per process, so a single exit handler covers every copy;
+    # it gets the records themselves and never goes through the caches
+    temp_databases = set()
+    atexit.register(remove_temp_databases, temp_databases, get_open_connections())
+    return temp_databases
+
+def remove_temp_databases(temp_databases, open_connections):
+    """Close and delete every temp database copy still on disk"""
+    for db_path in list(temp_databases):
+        remove_temp_database(db_path, temp_databases, open_connections)
+
+def remove_temp_database(db_path, temp_databases=None, open_connections=None):
+    """Close the shared connection to a temp database copy, then delete the copy"""
+    if temp_databases is None:
+        temp_databases = get_temp_databases()
+    if open_connections is None:
+        open_connections = get_open_connections()
+    
+    # An open SQLite handle keeps the file locked on Windows. Only this path's
+    # handle is closed; its closed cache entry fails validation and is dropped
+    conn = open_connections.pop(db_path, None)
+    if conn is not None:
         conn.close()
-        return beacons['Description'].tolist()
-    except Exception as e:
-        st.error(f"Error reading beacons from database: {e}")
-        return []
+    temp_databases.discard(db_path)
+    try:
+        os.unlink(db_path)
+    except OSError:
+        # Cleanup is best effort; a leftover temp file is harmless
+        pass
 
-def get_date_range_from_db(db_path):
-    """Get min and max dates from database"""
+def save_uploaded_database(uploaded_file, file_hash):
+    """Write the uploaded database to a temp file once per distinct upload"""
+    saved = st.session_state.get('uploaded_db')
+    if saved is not None:
+        saved_hash, saved_path = saved
+        if saved_hash == file_hash and os.path.exists(saved_path):
+            return saved_path
+        # A different database was uploaded, drop the previous copy
+        remove_temp_database(saved_path)
+    
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp_file:
+        # Stream in 1 MiB chunks rather than materializing another bytes copy
+        uploaded_file.seek(0)
+        shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
+        db_path = tmp_file.name
+    
+    # Reruns keep reusing the copy; it is removed on the next upload or when
+    # the server exits
+    get_temp_databases().add(db_path)
+    add_query_indexes(db_path)
+    st.session_state.uploaded_db = (file_hash, db_path)
+    return db_path
+
+def add_query_indexes(db_path):
+    """Index the temp copy so time range queries don't scan the whole event table"""
     try:
         conn = sqlite3.connect(db_path)
-        query = "SELECT MIN(DateTime) as min_date, MAX(DateTime) as max_date FROM BeaconEvent"
-        result = pd.read_sql_query(query, conn)
+        # The copy is private and disposable, skip journaling and fsync.
+        # The beacon index covers every column the data query reads, with the
+        # equality column first and the DateTime range second.
+        conn.executescript("""
+        PRAGMA journal_mode=OFF;
+        PRAGMA synchronous=OFF;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        CREATE INDEX IF NOT EXISTS ix_be_dt_bid ON BeaconEvent(DateTime, BeaconId);
+        CREATE INDEX IF NOT EXISTS ix_be_bid_dt ON BeaconEvent(
+            BeaconId, DateTime,
+            ExternalSensorTemperature, ExternalSensorTemperatureExt1, RSSI
+        );
+        ANALYZE;
+        """)
         conn.close()
-        
-        min_date = pd.to_datetime(result['min_date'].iloc[0])
-        max_date = pd.to_datetime(result['max_date'].iloc[0])
-        return min_date, max_date
-    except Exception as e:
-        st.error(f"Error reading date range: {e}")
-        return None, None
+    except sqlite3.Error:
+        # Indexes are only an optimization; schema problems are reported by the readers
+        pass
+
+def connection_is_open(conn):
+    """Whether a cached connection has not been closed by remove_temp_database"""
+    try:
+        conn.total_changes
+    except sqlite3.ProgrammingError:
+        return False
+    return True
 
-def get_dataframe_from_database(db_path, startup_datetime_str, cutoff_datetime_str, selected_beacons=None):
-    """Get DataFrame from database with optional beacon filtering"""
-    conn = sqlite3.connect(db_path)
+@st.cache_resource(show_spinner=False, max_entries=4, validate=connection_is_open)
+def get_connection(db_path):
+    """Shared read-only connection to the uploaded database copy"""
+    # The temp copy never changes once indexed, so SQLite can skip locking
+    uri = Path(db_path).resolve().as_uri() + '?mode=ro&immutable=1'
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA cache_size=-65536')
+    # GROUP BY and DISTINCT sorters stay in memory instead of temp files
+    conn.execute('PRAGMA temp_store=MEMORY')
+    get_open_connections()[db_path] = conn
+    return conn
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_database_overview(db_path, file_hash):
+    """Get the list of available beacons and the min and max event dates in one query"""
+    try:
+        conn = get_connection(db_path)
+        # The date range subqueries are uncorrelated, so SQLite evaluates them
+        # once (two probes of the DateTime index) rather than per beacon
+        query = """
+        SELECT DISTINCT
+            beacon.Description,
+            (SELECT MIN(DateTime) FROM BeaconEvent) as min_date,
+            (SELECT MAX(DateTime) FROM BeaconEvent) as max_date
+        FROM Beacon beacon
+        ORDER BY beacon.Description
+        """
+        rows = conn.execute(query).fetchall()
+    except Exception as e:
+        st.error(f"Error reading database: {e}")
+        return [], None, None
+    
+    if not rows:
+        return [], None, None
     
+    # Only the dates are used; the first 19 characters are the ISO 8601
+    # date and time whatever fractional seconds the file stores
+    beacons = [row[0] for row in rows]
+    _, min_value, max_value = rows[0]
+    try:
+        return beacons, datetime.fromisoformat(min_value[:19]), datetime.fromisoformat(max_value[:19])
+    except (TypeError, ValueError):
+        # No events or non-ISO timestamps; the caller reports the missing range
+        return beacons, None, None
+
+def build_bucket_query(startup_datetime, cutoff_datetime, selected_beacons=None, time_window_seconds=300):
+    """Build the SQL and parameters of the bucketed beacon data query"""
     # Build query with optional beacon filtering
     beacon_filter = ""
-    params = [startup_datetime_str, cutoff_datetime_str]
+    params = [time_window_seconds, time_window_seconds, startup_datetime, cutoff_datetime]
     
     if selected_beacons:
+        # Resolving the names to ids up front lets the (BeaconId, DateTime)
+        # index serve each selected beacon's range directly
         beacon_placeholders = ','.join(['?' for _ in selected_beacons])
-        beacon_filter = f"AND beacon.Description IN ({beacon_placeholders})"
+        beacon_filter = f"AND event.BeaconId IN (SELECT Id FROM Beacon WHERE Description IN ({beacon_placeholders}))"
         params.extend(selected_beacons)
     
+    # Events are bucketed by epoch seconds so only one row per beacon and
+    # time window leaves SQLite, keyed by the bucket start as an integer.
+    # Grouping is positional because an alias named DateTime would resolve
+    # to the event column instead. No ORDER BY: the plot sorts each beacon's
+    # buckets itself. Events are grouped by beacon name, not id: several
+    # Beacon ids can share one Description and must merge into one series.
     query = f"""
     SELECT 
-        event.DateTime, 
+        (CAST(strftime('%s', event.DateTime) AS INTEGER) / ?) * ? as DateTime, 
         beacon.Description as BeaconDescription,
-        event.ExternalSensorTemperature,
-        event.ExternalSensorTemperatureExt1,
-        event.RSSI
+        AVG(event.ExternalSensorTemperature) as ExternalSensorTemperature,
+        AVG(event.ExternalSensorTemperatureExt1) as ExternalSensorTemperatureExt1,
+        AVG(event.RSSI) as RSSI,
+        MAX(event.ExternalSensorTemperature) as MaxTemperature,
+        COUNT(*) as DataPoints,
+        COUNT(event.ExternalSensorTemperature) as TempPoints,
+        COUNT(event.RSSI) as RssiPoints
     FROM BeaconEvent event
     INNER JOIN Beacon beacon ON event.BeaconId = beacon.Id
     WHERE event.DateTime BETWEEN ? AND ? {beacon_filter}
-    ORDER BY event.DateTime
+    GROUP BY 1, 2
     """
+    return query, params
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_dataframe_from_database(db_path, file_hash, startup_datetime, cutoff_datetime, selected_beacons=None, time_window_seconds=300):
+    """Get DataFrame from database with optional beacon filtering, pre-aggregated into time buckets"""
+    conn = get_connection(db_path)
+    query, params = build_bucket_query(startup_datetime, cutoff_datetime, selected_beacons, time_window_seconds)
     
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
+    # The rows go straight into a frame; read_sql_query would only add
+    # per-column inspection on top of the same fetch
+    cursor = conn.execute(query, params)
+    columns = [column[0] for column in cursor.description]
+    df = pd.DataFrame.from_records(cursor.fetchall(), columns=columns).astype(BUCKET_DTYPES)
     
-    df['DateTime'] = pd.to_datetime(df['DateTime'])
+    # Bucket starts are epoch seconds, converted without any string parsing
+    df['DateTime'] = pd.to_datetime(df['DateTime'], unit='s')
     return df
 
-def create_interactive_plot(df, beacon, time_window):
-    """Create interactive Plotly plot for a beacon"""
-    beacon_data = df[df['BeaconDescription'] == beacon].copy()
+def summarize_beacons(df):
+    """Per-beacon average and maximum temperature, average RSSI and event count in one groupby pass"""
+    # Each bucket average is weighted by the number of readings SQL AVG()
+    # actually averaged, which skips NULLs; buckets without a reading get no
+    # weight (their NaN average drops out of the sums)
+    temp_counts = df['TempPoints'].astype('int64')
+    rssi_counts = df['RssiPoints'].astype('int64')
+    totals = pd.DataFrame({
+        'BeaconDescription': df['BeaconDescription'],
+        'temp_sum': df['ExternalSensorTemperature'].astype('float64') * temp_counts,
+        'temp_n': temp_counts,
+        'rssi_sum': df['RSSI'].astype('float64') * rssi_counts,
+        'rssi_n': rssi_counts,
+        'n': df['DataPoints'],
+        'max_temp': df['MaxTemperature'],
+    }).groupby('BeaconDescription', sort=False, observed=True).agg({
+        'temp_sum': 'sum',
+        'temp_n': 'sum',
+        'rssi_sum': 'sum',
+        'rssi_n': 'sum',
+        'n': 'sum',
+        'max_temp': 'max',
+    })
     
-    if beacon_data.empty:
+    return pd.DataFrame({
+        'avg_temp': totals['temp_sum'] / totals['temp_n'],
+        'avg_rssi': totals['rssi_sum'] / totals['rssi_n'],
+        'n': totals['n'],
+        'max_temp': totals['max_temp'],
+    })
+
+def create_interactive_plot(groups, beacons, time_window):
+    """Create one interactive Plotly figure with a row per beacon, sharing the time axis"""
+    if not beacons:
         return None
     
-    beacon_data.set_index('DateTime', inplace=True)
-    
-    # Resample data
-    temp_resampled = beacon_data['ExternalSensorTemperature'].resample(time_window).mean()
-    temp_ext1_resampled = beacon_data['ExternalSensorTemperatureExt1'].resample(time_window).mean()
-    rssi_median = beacon_data['RSSI'].resample(time_window).median()
-    
-    # Create subplot with secondary y-axis
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    
-    # Add temperature traces
-    fig.add_trace(
-        go.Scatter(
-            x=temp_resampled.index, 
-            y=temp_resampled.values,
-            mode='lines+markers',
-            name='Temperature (°C)',
-            line=dict(color='blue'),
-            marker=dict(size=4)
-        ),
-        secondary_y=False,
-    )
+    # Plotting libraries load on first use, not on every app start
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    from plotly_resampler import FigureResampler, MinMaxLTTB
     
-    fig.add_trace(
-        go.Scatter(
-            x=temp_ext1_resampled.index, 
-            y=temp_ext1_resampled.values,
-            mode='lines+markers',
-            name='Temperature Ext1 (°C)',
-            line=dict(color='green'),
-            marker=dict(size=4, symbol='square')
+    # One figure for all beacons keeps a single WebGL context in the browser;
+    # the resampler keeps the full series server-side and only ships a
+    # bounded number of points per trace
+    n_rows = len(beacons)
+    fig = FigureResampler(
+        make_subplots(
+            rows=n_rows,
+            cols=1,
+            shared_xaxes=True,
+            vertical_spacing=min(0.08, 0.3 / n_rows),
+            subplot_titles=[f"🎯 {beacon}" for beacon in beacons],
+            specs=[[{"secondary_y": True}]] * n_rows
         ),
-        secondary_y=False,
+        default_n_shown_samples=MAX_POINTS_PER_TRACE,
+        default_downsampler=MinMaxLTTB()
     )
     
-    # Add RSSI trace
-    fig.add_trace(
-        go.Scatter(
-            x=rssi_median.index, 
-            y=rssi_median.values,
-            mode='markers',
-            name='RSSI Median',
-            line=dict(color='red'),
-            marker=dict(size=4)
-        ),
-        secondary_y=True,
-    )
+    window = pd.Timedelta(time_window)
+    max_points = 0
+    for row, beacon in enumerate(beacons, start=1):
+        beacon_data = groups.get_group(beacon)[PLOT_COLUMNS].set_index('DateTime').sort_index()
+        
+        # Rows are already aggregated per window by the query, one per bucket,
+        # so no resampling is needed. Empty windows still have to break the
+        # lines: one blank row ahead of each gap does that, where regridding
+        # the whole span would create a row per empty window and blow up on a
+        # few outlying timestamps
+        gaps = beacon_data.index[1:][np.diff(beacon_data.index.values) > window]
+        resampled = beacon_data.reindex(beacon_data.index.union(gaps - window))
+        temp_resampled = resampled['ExternalSensorTemperature']
+        temp_ext1_resampled = resampled['ExternalSensorTemperatureExt1']
+        rssi_mean = resampled['RSSI']
+        max_points = max(max_points, len(resampled))
+        
+        # Only the first row contributes legend entries; legend groups
+        # toggle the same series in every row
+        show_legend = row == 1
+        
+        # Add temperature traces
+        fig.add_trace(
+            go.Scattergl(
+                mode='lines+markers',
+                name='Temperature (°C)',
+                legendgroup='temperature',
+                showlegend=show_legend,
+                line=dict(color='blue'),
+                marker=dict(size=4)
+            ),
+            hf_x=temp_resampled.index.values,
+            hf_y=temp_resampled.to_numpy(),
+            row=row, col=1,
+            secondary_y=False,
+        )
+        
+        fig.add_trace(
+            go.Scattergl(
+                mode='lines+markers',
+                name='Temperature Ext1 (°C)',
+                legendgroup='temperature_ext1',
+                showlegend=show_legend,
+                line=dict(color='green'),
+                marker=dict(size=4, symbol='square')
+            ),
+            hf_x=temp_ext1_resampled.index.values,
+            hf_y=temp_ext1_resampled.to_numpy(),
+            row=row, col=1,
+            secondary_y=False,
+        )
+        
+        # Add RSSI trace
+        fig.add_trace(
+            go.Scattergl(
+                mode='markers',
+                name='RSSI Mean',
+                legendgroup='rssi',
+                showlegend=show_legend,
+                line=dict(color='red'),
+                marker=dict(size=4)
+            ),
+            hf_x=rssi_mean.index.values,
+            hf_y=rssi_mean.to_numpy(),
+            row=row, col=1,
+            secondary_y=True,
+        )
     
     # Update layout
-    fig.update_xaxes(title_text="Time")
+    fig.update_xaxes(title_text="Time", row=n_rows, col=1)
     fig.update_yaxes(title_text="Temperature (°C)", range=[20, 125], secondary_y=False)
     fig.update_yaxes(title_text="RSSI (dBm)", range=[-100, -50], secondary_y=True)
     
+    title = 'Temperature and RSSI vs Time'
+    if max_points > MAX_POINTS_PER_TRACE:
+        title += f' (LTTB downsampled: {MAX_POINTS_PER_TRACE} of up to {max_points} points per trace)'
+    
     fig.update_layout(
-        title=f'Temperature and RSSI vs Time - {beacon}',
+        title=title,
         hovermode='x unified',
-        height=500
+        height=max(500, 350 * n_rows),
+        template='plotly_white',
+        # Keep the user's zoom and legend toggles when the figure is redrawn
+        uirevision='constant'
     )
     
     return fig
 
-def get_beacon_data_quality(db_path, beacons, start_datetime_str, end_datetime_str):
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_beacon_figure(data_key, beacons, time_window, _groups):
+    """Build the analysis figure once per loaded data set, window and page of beacons"""
+    # data_key (file hash and time range) identifies the rows behind _groups,
+    # which Streamlit does not hash
+    return create_interactive_plot(_groups, list(beacons), time_window)
+
+@st.fragment
+def show_beacon_plots(groups, beacons, time_window, data_key):
+    """Plot one page of beacons at a time; changing page reruns only this fragment"""
+    pages = range(0, len(beacons), BEACONS_PER_PAGE)
+    start = 0
+    if len(pages) > 1:
+        start = st.selectbox(
+            "Beacons shown",
+            options=pages,
+            format_func=lambda i: f"{i + 1}–{min(i + BEACONS_PER_PAGE, len(beacons))} of {len(beacons)}",
+            key="beacon_plot_page"
+        )
+    
+    # Only the visible page is built and sent to the browser; pages already
+    # viewed come back from the figure cache
+    fig = get_beacon_figure(data_key, tuple(beacons[start:start + BEACONS_PER_PAGE]), time_window, groups)
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_beacon_data_quality(db_path, file_hash, start_datetime, end_datetime):
     """Analyze beacon data quality for smart selection"""
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         
         # Get data counts and quality metrics for all beacons
         query = """
@@ -158,7 +429,7 @@ def get_beacon_data_quality(db_path, beacons, start_datetime_str, end_datetime_s
             MIN(event.ExternalSensorTemperature) as MinTemp,
             MAX(event.ExternalSensorTemperature) as MaxTemp,
             AVG(event.RSSI) as AvgRSSI,
-            COUNT(CASE WHEN event.ExternalSensorTemperature IS NULL THEN 1 END) as NullTemps
+            SUM(event.ExternalSensorTemperature IS NULL) as NullTemps
         FROM BeaconEvent event
         INNER JOIN Beacon beacon ON event.BeaconId = beacon.Id
         WHERE event.DateTime BETWEEN ? AND ?
@@ -166,75 +437,81 @@ def get_beacon_data_quality(db_path, beacons, start_datetime_str, end_datetime_s
         ORDER BY DataPoints DESC
         """
         
-        df = pd.read_sql_query(query, conn, params=[start_datetime_str, end_datetime_str])
-        conn.close()
+        df = pd.read_sql_query(query, conn, params=[start_datetime, end_datetime])
         
         return df
     except Exception as e:
         return None
 
-def create_beacon_temperature_schematic(df, startup_datetime_str, cutoff_datetime_str, target_temp=115):
-    """Create a 3x11 grid schematic showing beacon temperatures with color coding"""
-    startup_datetime = datetime.strptime(startup_datetime_str, '%Y-%m-%d %H:%M:%S')
-    cutoff_datetime = datetime.strptime(cutoff_datetime_str, '%Y-%m-%d %H:%M:%S')
-    filtered_df = df[(df['DateTime'] >= startup_datetime) & (df['DateTime'] <= cutoff_datetime)]
+def classify_temperatures(max_temps, target_temp):
+    """Class index per beacon: 0 within ±5°C, 1 within ±15°C, 2 beyond (or no reading)"""
+    temp_diffs = np.abs(max_temps.to_numpy() - target_temp)
+    # side='left' keeps the thresholds inclusive; NaN sorts past the last one
+    return np.searchsorted(TEMP_DIFF_THRESHOLDS, temp_diffs, side='left')
+
+def create_beacon_temperature_schematic(max_temps, target_temp=115):
+    """Create a 3x11 grid schematic showing each beacon's maximum temperature with color coding"""
+    import plotly.graph_objects as go
     
-    if filtered_df.empty:
+    # The query already restricts rows to the selected time range
+    if max_temps.empty:
         return None, "No data found for the specified time range."
     
-    # Get maximum temperature for each beacon instead of last
-    max_temps = filtered_df.groupby('BeaconDescription')['ExternalSensorTemperature'].max().round(1)
-    beacons = sorted(max_temps.index.tolist())
+    max_temps = max_temps.round(1).sort_index()
+    beacons = max_temps.index.tolist()
+    classes = classify_temperatures(max_temps, target_temp)
     
-    # Create 3x11 grid
-    fig, axes = plt.subplots(3, 11, figsize=(16, 8))
-    fig.suptitle(f'Beacon Temperature Schematic (Max vs Target {target_temp}°C)', fontsize=16)
+    # Lay the class codes out as the 3x11 grid; unused cells get -1 (white)
+    n_rows, n_cols = 3, 11
+    n_shown = min(len(beacons), n_rows * n_cols)
+    class_grid = np.full(n_rows * n_cols, -1)
+    class_grid[:n_shown] = classes[:n_shown]
+    labels = np.full(n_rows * n_cols, 'Empty', dtype=object)
+    labels[:n_shown] = [
+        f'<b>{beacon}</b><br>{max_temp}°C'
+        for beacon, max_temp in zip(beacons[:n_shown], max_temps.iloc[:n_shown])
+    ]
     
-    for i in range(3):
-        for j in range(11):
-            ax = axes[i, j]
-            beacon_idx = i * 11 + j
-            
-            if beacon_idx < len(beacons):
-                beacon = beacons[beacon_idx]
-                max_temp = max_temps[beacon]
-                
-                # Color coding: green if close to target, red if far
-                temp_diff = abs(max_temp - target_temp)
-                if temp_diff <= 5:
-                    color = 'lightgreen'
-                elif temp_diff <= 15:
-                    color = 'yellow'
-                else:
-                    color = 'lightcoral'
-                
-                # Create colored rectangle
-                rect = patches.Rectangle((0, 0), 1, 1, linewidth=2, edgecolor='black', facecolor=color)
-                ax.add_patch(rect)
-                
-                # Add text
-                ax.text(0.5, 0.7, beacon, ha='center', va='center', fontweight='bold', fontsize=8)
-                ax.text(0.5, 0.4, f'{max_temp}°C', ha='center', va='center', fontsize=10)
-                
-            else:
-                # Empty cell
-                ax.add_patch(patches.Rectangle((0, 0), 1, 1, linewidth=1, edgecolor='gray', facecolor='white'))
-                ax.text(0.5, 0.5, 'Empty', ha='center', va='center', fontsize=8, color='gray')
-            
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.set_xticks([])
-            ax.set_yticks([])
+    # Each code sits exactly on one stop of the colorscale
+    colors = ['white'] + list(TEMP_CLASS_COLORS)
+    colorscale = [[i / (len(colors) - 1), color] for i, color in enumerate(colors)]
+    
+    fig = go.Figure(go.Heatmap(
+        z=class_grid.reshape(n_rows, n_cols),
+        text=labels.reshape(n_rows, n_cols),
+        texttemplate='%{text}',
+        hovertemplate='%{text}<extra></extra>',
+        colorscale=colorscale,
+        zmin=-1,
+        zmax=len(TEMP_CLASS_COLORS) - 1,
+        xgap=2,
+        ygap=2,
+        showscale=False
+    ))
     
     # Add legend
-    legend_elements = [
-        patches.Patch(color='lightgreen', label=f'Within ±5°C of {target_temp}°C'),
-        patches.Patch(color='yellow', label=f'Within ±15°C of {target_temp}°C'),
-        patches.Patch(color='lightcoral', label=f'More than ±15°C from {target_temp}°C')
+    legend_labels = [
+        f'Within ±5°C of {target_temp}°C',
+        f'Within ±15°C of {target_temp}°C',
+        f'More than ±15°C from {target_temp}°C'
     ]
-    fig.legend(handles=legend_elements, loc='lower center', ncol=3, bbox_to_anchor=(0.5, -0.05))
+    for color, label in zip(TEMP_CLASS_COLORS, legend_labels):
+        fig.add_trace(go.Scatter(
+            x=[None], y=[None],
+            mode='markers',
+            marker=dict(size=12, color=color, symbol='square'),
+            name=label
+        ))
+    
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False, autorange='reversed')
+    fig.update_layout(
+        title=f'Beacon Temperature Schematic (Max vs Target {target_temp}°C)',
+        plot_bgcolor='black',
+        legend=dict(orientation='h', yanchor='top', y=-0.05, xanchor='center', x=0.5),
+        height=500
+    )
     
-    plt.tight_layout()
     return fig, None
 
 # Main Streamlit app
@@ -250,351 +527,369 @@ def main():
     )
     
     if uploaded_file is not None:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            db_path = tmp_file.name
-        
-        try:
-            # Get available beacons
-            beacons = get_beacons_from_db(db_path)
-            
-            if not beacons:
-                st.error("No beacons found in the database or error reading data.")
-                return
+        # Save uploaded file temporarily, reusing the copy across reruns
+        # Hash the upload's buffer in place, once per upload; the digest
+        # keys every cache
+        saved_digest = st.session_state.get('upload_digest')
+        if saved_digest is not None and saved_digest[0] == uploaded_file.file_id:
+            file_hash = saved_digest[1]
+        else:
+            with uploaded_file.getbuffer() as file_buffer:
+                file_hash = hashlib.blake2b(file_buffer, digest_size=16).hexdigest()
+            st.session_state.upload_digest = (uploaded_file.file_id, file_hash)
+        db_path = save_uploaded_database(uploaded_file, file_hash)
+        
+        # Get available beacons and date range
+        beacons, min_date, max_date = get_database_overview(db_path, file_hash)
+        
+        if not beacons:
+            st.error("No beacons found in the database or error reading data.")
+            return
+        
+        if min_date is None or max_date is None:
+            st.error("Could not determine date range from database.")
+            return
+        
+        # Sidebar controls
+        st.sidebar.header("🎛️ Controls")
+        
+        # Enhanced beacon selection
+        st.sidebar.subheader("🎯 Beacon Selection")
+        
+        # Quick selection buttons
+        col1, col2, col3 = st.sidebar.columns(3)
+        with col1:
+            if st.button("Select All", help="Select all beacons"):
+                st.session_state.selected_beacons = beacons.copy()
+        with col2:
+            if st.button("Clear All", help="Deselect all beacons"):
+                st.session_state.selected_beacons = []
+        with col3:
+            if st.button("First 10", help="Select first 10 beacons"):
+                st.session_state.selected_beacons = beacons[:10]
+        
+        # Smart selection button
+        smart_col1, smart_col2 = st.sidebar.columns(2)
+        with smart_col1:
+            if st.button("🧠 Smart Select", help="Select beacons with best data quality"):
+                # Applied below, once the selected time range is known
+                st.session_state.quality_selection = 'smart'
+        with smart_col2:
+            if st.button("🎯 Good Temp", help="Select beacons with good temperature data"):
+                st.session_state.quality_selection = 'good_temp'
+        
+        # Initialize session state for selected beacons
+        if 'selected_beacons' not in st.session_state:
+            st.session_state.selected_beacons = beacons[:3] if len(beacons) >= 3 else beacons.copy()
+        
+        # Beacon selection with search and range selection
+        search_term = st.sidebar.text_input(
+            "🔍 Search Beacons", 
+            placeholder="Type to filter beacons...",
+            help="Filter beacon list by name"
+        )
+        
+        # Filter beacons based on search
+        filtered_beacons = [b for b in beacons if search_term.lower() in b.lower()] if search_term else beacons
+        
+        # Range selection
+        if len(filtered_beacons) > 1:
+            st.sidebar.write("**Range Selection:**")
+            range_col1, range_col2 = st.sidebar.columns(2)
+            with range_col1:
+                start_idx = st.selectbox(
+                    "From:", 
+                    options=range(len(filtered_beacons)),
+                    format_func=lambda x: f"{x+1}. {filtered_beacons[x]}",
+                    key="start_range"
+                )
+            with range_col2:
+                end_idx = st.selectbox(
+                    "To:", 
+                    options=range(len(filtered_beacons)),
+                    index=min(9, len(filtered_beacons)-1),
+                    format_func=lambda x: f"{x+1}. {filtered_beacons[x]}",
+                    key="end_range"
+                )
             
-            # Get date range
-            min_date, max_date = get_date_range_from_db(db_path)
+            if st.sidebar.button("Select Range", help="Select beacons from start to end index"):
+                start = min(start_idx, end_idx)
+                end = max(start_idx, end_idx)
+                range_beacons = filtered_beacons[start:end+1]
+                # Add to existing selection (union)
+                st.session_state.selected_beacons = list(set(st.session_state.selected_beacons + range_beacons))
+        
+        # Main multiselect with current selection
+        selected_beacons = st.sidebar.multiselect(
+            "Selected Beacon(s)",
+            options=beacons,
+            default=st.session_state.selected_beacons,
+            help="Choose one or more beacons to analyze. Use buttons above for quick selection.",
+            key="beacon_multiselect"
+        )
+        
+        # Update session state
+        st.session_state.selected_beacons = selected_beacons
+        
+        # Show selection summary
+        if selected_beacons:
+            st.sidebar.success(f"✅ {len(selected_beacons)} beacon(s) selected")
             
-            if min_date is None or max_date is None:
-                st.error("Could not determine date range from database.")
+            # Advanced selection options
+            with st.sidebar.expander("🔧 Advanced Selection"):
+                # Pattern-based selection
+                pattern = st.text_input(
+                    "Select by pattern", 
+                    placeholder="e.g., Beacon_0, _01, etc.",
+                    help="Select beacons matching a pattern"
+                )
+                if pattern and st.button("Apply Pattern"):
+                    pattern_matches = [b for b in beacons if pattern.lower() in b.lower()]
+                    st.session_state.selected_beacons = list(set(st.session_state.selected_beacons + pattern_matches))
+                    st.rerun()
+                
+                # Temperature-based selection (if we have previous data)
+                st.write("**Quick Select by Temperature Range:**")
+                temp_col1, temp_col2 = st.columns(2)
+                with temp_col1:
+                    min_temp = st.number_input("Min °C", value=100, step=5)
+                with temp_col2:
+                    max_temp = st.number_input("Max °C", value=130, step=5)
+                
+                if st.button("Select by Temp Range"):
+                    st.info("💡 This will work after first data analysis")
+        else:
+            st.sidebar.warning("⚠️ No beacons selected")
+        
+        # Checkbox grid for visual selection (for smaller beacon lists)
+        if len(beacons) <= 20:
+            with st.sidebar.expander("📋 Visual Selection Grid"):
+                st.write("Check/uncheck individual beacons:")
+                
+                # A single editable table instead of one checkbox widget per beacon
+                grid = st.data_editor(
+                    pd.DataFrame({
+                        'Beacon': beacons,
+                        'Selected': [beacon in selected_beacons for beacon in beacons]
+                    }),
+                    hide_index=True,
+                    disabled=['Beacon'],
+                    column_config={'Selected': st.column_config.CheckboxColumn()},
+                    use_container_width=True
+                )
+                st.session_state.selected_beacons = grid.loc[grid['Selected'], 'Beacon'].tolist()
+        
+        # Date range selection
+        col1, col2 = st.sidebar.columns(2)
+        with col1:
+            start_date = st.date_input(
+                "Start Date", 
+                value=min_date.date(),
+                min_value=min_date.date(),
+                max_value=max_date.date()
+            )
+        with col2:
+            end_date = st.date_input(
+                "End Date", 
+                value=max_date.date(),
+                min_value=min_date.date(),
+                max_value=max_date.date()
+            )
+        
+        # Time range selection
+        col3, col4 = st.sidebar.columns(2)
+        with col3:
+            start_time = st.time_input("Start Time", value=datetime.strptime("10:00", "%H:%M").time())
+        with col4:
+            end_time = st.time_input("End Time", value=datetime.strptime("18:00", "%H:%M").time())
+        
+        # Combine date and time early for use in smart selection
+        start_datetime = datetime.combine(start_date, start_time)
+        end_datetime = datetime.combine(end_date, end_time)
+        
+        # Apply a pending smart selection; both buttons share the cached
+        # quality query for the current time range
+        quality_selection = st.session_state.pop('quality_selection', None)
+        if quality_selection:
+            quality_df = get_beacon_data_quality(
+                db_path, 
+                file_hash,
+                start_datetime,
+                end_datetime
+            )
+            if quality_df is None or quality_df.empty:
+                st.session_state.selected_beacons = beacons[:10]
+            elif quality_selection == 'smart':
+                # Select top 10 beacons by data points and low null count
+                quality_df['Quality_Score'] = quality_df['DataPoints'] - (quality_df['NullTemps'] * 10)
+                top_beacons = quality_df.nlargest(10, 'Quality_Score')['BeaconDescription'].tolist()
+                st.session_state.selected_beacons = top_beacons
+            else:
+                # Select beacons with temperature in reasonable range and good data
+                good_temp = quality_df[
+                    (quality_df['AvgTemp'] >= 50) & 
+                    (quality_df['AvgTemp'] <= 150) & 
+                    (quality_df['DataPoints'] >= 10)
+                ]['BeaconDescription'].tolist()
+                st.session_state.selected_beacons = good_temp[:15] if good_temp else beacons[:10]
+            st.rerun()
+        
+        # Time window selection
+        time_window = st.sidebar.selectbox(
+            "Time Window for Resampling",
+            options=['1min', '5min', '10min', '30min', '1H'],
+            index=1
+        )
+        
+        # Beacon schematic options
+        st.sidebar.subheader("🌡️ Beacon Temperature Schematic")
+        show_schematic = st.sidebar.checkbox("Show Temperature Schematic", value=False)
+        
+        if show_schematic:
+            target_temp = st.sidebar.number_input(
+                "Target Temperature (°C)",
+                min_value=50,
+                max_value=150,
+                value=115,
+                help="Reference temperature for color coding"
+            )
+        
+        st.sidebar.checkbox(
+            "Show SQL query plan",
+            key='debug_sql',
+            help="Developer check that the data query is served by the beacon indexes"
+        )
+        
+        # Analysis button
+        if st.sidebar.button("🔍 Analyze Data", type="primary"):
+            if not selected_beacons:
+                st.session_state.pop('analysis', None)
+                st.warning("Please select at least one beacon.")
                 return
+            # Keep what was analyzed, so later reruns (other widgets, the plot
+            # pager) still show the results and not only the click's rerun
+            st.session_state.analysis = (file_hash, start_datetime, end_datetime, tuple(selected_beacons), time_window)
+        
+        analysis = st.session_state.get('analysis')
+        if analysis is not None and analysis[0] == file_hash:
+            _, analysis_start, analysis_end, analysis_beacons, analysis_window = analysis
             
-            # Sidebar controls
-            st.sidebar.header("🎛️ Controls")
-            
-            # Enhanced beacon selection
-            st.sidebar.subheader("🎯 Beacon Selection")
-            
-            # Quick selection buttons
-            col1, col2, col3 = st.sidebar.columns(3)
-            with col1:
-                if st.button("Select All", help="Select all beacons"):
-                    st.session_state.selected_beacons = beacons.copy()
-            with col2:
-                if st.button("Clear All", help="Deselect all beacons"):
-                    st.session_state.selected_beacons = []
-            with col3:
-                if st.button("First 10", help="Select first 10 beacons"):
-                    st.session_state.selected_beacons = beacons[:10]
+            # Get data
+            time_window_seconds = int(pd.Timedelta(analysis_window).total_seconds())
+            with st.spinner("Loading data from database..."):
+                df = get_dataframe_from_database(
+                    db_path, 
+                    file_hash,
+                    analysis_start,
+                    analysis_end,
+                    analysis_beacons,
+                    time_window_seconds
+                )
             
-            # Smart selection button
-            smart_col1, smart_col2 = st.sidebar.columns(2)
-            with smart_col1:
-                if st.button("🧠 Smart Select", help="Select beacons with best data quality"):
-                    # Get data quality info
-                    quality_df = get_beacon_data_quality(
-                        db_path, 
-                        beacons, 
-                        start_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-                        end_datetime.strftime('%Y-%m-%d %H:%M:%S')
-                    )
-                    if quality_df is not None and not quality_df.empty:
-                        # Select top 10 beacons by data points and low null count
-                        quality_df['Quality_Score'] = quality_df['DataPoints'] - (quality_df['NullTemps'] * 10)
-                        top_beacons = quality_df.nlargest(10, 'Quality_Score')['BeaconDescription'].tolist()
-                        st.session_state.selected_beacons = top_beacons
-                    else:
-                        st.session_state.selected_beacons = beacons[:10]
-            with smart_col2:
-                if st.button("🎯 Good Temp", help="Select beacons with good temperature data"):
-                    quality_df = get_beacon_data_quality(
-                        db_path, 
-                        beacons, 
-                        start_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-                        end_datetime.strftime('%Y-%m-%d %H:%M:%S')
-                    )
-                    if quality_df is not None and not quality_df.empty:
-                        # Select beacons with temperature in reasonable range and good data
-                        good_temp = quality_df[
-                            (quality_df['AvgTemp'] >= 50) & 
-                            (quality_df['AvgTemp'] <= 150) & 
-                            (quality_df['DataPoints'] >= 10)
-                        ]['BeaconDescription'].tolist()
-                        st.session_state.selected_beacons = good_temp[:15] if good_temp else beacons[:10]
-                    else:
-                        st.session_state.selected_beacons = beacons[:10]
+            if st.session_state.get('debug_sql'):
+                # A SCAN of BeaconEvent here means an edit to the query stopped
+                # it from using ix_be_bid_dt / ix_be_dt_bid
+                query, params = build_bucket_query(
+                    analysis_start,
+                    analysis_end,
+                    analysis_beacons,
+                    time_window_seconds
+                )
+                plan = get_connection(db_path).execute('EXPLAIN QUERY PLAN ' + query, params).fetchall()
+                with st.expander("🛠️ SQL Query Plan", expanded=True):
+                    st.code('\n'.join(row[-1] for row in plan))
             
-            # Initialize session state for selected beacons
-            if 'selected_beacons' not in st.session_state:
-                st.session_state.selected_beacons = beacons[:3] if len(beacons) >= 3 else beacons.copy()
+            if df.empty:
+                st.warning("No data found for the selected criteria.")
+                return
             
-            # Beacon selection with search and range selection
-            search_term = st.sidebar.text_input(
-                "🔍 Search Beacons", 
-                placeholder="Type to filter beacons...",
-                help="Filter beacon list by name"
-            )
+            # Split per beacon once; plots and summaries reuse the groups
+            groups = df.groupby('BeaconDescription', sort=False, observed=True)
+            stats = summarize_beacons(df)
+            max_temps = stats['max_temp']
             
-            # Filter beacons based on search
-            filtered_beacons = [b for b in beacons if search_term.lower() in b.lower()] if search_term else beacons
+            # Display summary
+            st.success(f"✅ Found {df['DataPoints'].sum()} data points for {len(analysis_beacons)} beacon(s)")
             
-            # Range selection
-            if len(filtered_beacons) > 1:
-                st.sidebar.write("**Range Selection:**")
-                range_col1, range_col2 = st.sidebar.columns(2)
-                with range_col1:
-                    start_idx = st.selectbox(
-                        "From:", 
-                        options=range(len(filtered_beacons)),
-                        format_func=lambda x: f"{x+1}. {filtered_beacons[x]}",
-                        key="start_range"
-                    )
-                with range_col2:
-                    end_idx = st.selectbox(
-                        "To:", 
-                        options=range(len(filtered_beacons)),
-                        index=min(9, len(filtered_beacons)-1),
-                        format_func=lambda x: f"{x+1}. {filtered_beacons[x]}",
-                        key="end_range"
-                    )
+            # Show beacon temperature schematic if enabled
+            if show_schematic:
+                st.header("🌡️ Beacon Temperature Schematic")
                 
-                if st.sidebar.button("Select Range", help="Select beacons from start to end index"):
-                    start = min(start_idx, end_idx)
-                    end = max(start_idx, end_idx)
-                    range_beacons = filtered_beacons[start:end+1]
-                    # Add to existing selection (union)
-                    st.session_state.selected_beacons = list(set(st.session_state.selected_beacons + range_beacons))
-            
-            # Main multiselect with current selection
-            selected_beacons = st.sidebar.multiselect(
-                "Selected Beacon(s)",
-                options=beacons,
-                default=st.session_state.selected_beacons,
-                help="Choose one or more beacons to analyze. Use buttons above for quick selection.",
-                key="beacon_multiselect"
-            )
-            
-            # Update session state
-            st.session_state.selected_beacons = selected_beacons
-            
-            # Show selection summary
-            if selected_beacons:
-                st.sidebar.success(f"✅ {len(selected_beacons)} beacon(s) selected")
+                with st.spinner("Creating temperature schematic..."):
+                    schematic_fig, error_msg = create_beacon_temperature_schematic(max_temps, target_temp)
                 
-                # Advanced selection options
-                with st.sidebar.expander("🔧 Advanced Selection"):
-                    # Pattern-based selection
-                    pattern = st.text_input(
-                        "Select by pattern", 
-                        placeholder="e.g., Beacon_0, _01, etc.",
-                        help="Select beacons matching a pattern"
-                    )
-                    if pattern and st.button("Apply Pattern"):
-                        pattern_matches = [b for b in beacons if pattern.lower() in b.lower()]
-                        st.session_state.selected_beacons = list(set(st.session_state.selected_beacons + pattern_matches))
-                        st.rerun()
+                if error_msg:
+                    st.error(error_msg)
+                elif schematic_fig:
+                    st.plotly_chart(schematic_fig, use_container_width=True)
                     
-                    # Temperature-based selection (if we have previous data)
-                    st.write("**Quick Select by Temperature Range:**")
-                    temp_col1, temp_col2 = st.columns(2)
-                    with temp_col1:
-                        min_temp = st.number_input("Min °C", value=100, step=5)
-                    with temp_col2:
-                        max_temp = st.number_input("Max °C", value=130, step=5)
+                    # Show beacon statistics summary
+                    st.subheader("📊 Schematic Summary")
+                    col1, col2, col3, col4 = st.columns(4)
                     
-                    if st.button("Select by Temp Range"):
-                        st.info("💡 This will work after first data analysis")
-            else:
-                st.sidebar.warning("⚠️ No beacons selected")
-            
-            # Checkbox grid for visual selection (for smaller beacon lists)
-            if len(beacons) <= 20:
-                with st.sidebar.expander("📋 Visual Selection Grid"):
-                    st.write("Check/uncheck individual beacons:")
+                    # Same classes as the schematic cells, counted in one pass
+                    classes = classify_temperatures(max_temps.round(1), target_temp)
+                    green_count, yellow_count, red_count = np.bincount(classes, minlength=3)
                     
-                    # Create checkbox grid (4 columns)
-                    cols = st.columns(2)
-                    for i, beacon in enumerate(beacons):
-                        with cols[i % 2]:
-                            is_selected = beacon in selected_beacons
-                            if st.checkbox(
-                                beacon, 
-                                value=is_selected, 
-                                key=f"checkbox_{beacon}_{i}"
-                            ):
-                                if beacon not in st.session_state.selected_beacons:
-                                    st.session_state.selected_beacons.append(beacon)
-                            else:
-                                if beacon in st.session_state.selected_beacons:
-                                    st.session_state.selected_beacons.remove(beacon)
-            
-            # Date range selection
-            col1, col2 = st.sidebar.columns(2)
-            with col1:
-                start_date = st.date_input(
-                    "Start Date", 
-                    value=min_date.date(),
-                    min_value=min_date.date(),
-                    max_value=max_date.date()
-                )
-            with col2:
-                end_date = st.date_input(
-                    "End Date", 
-                    value=max_date.date(),
-                    min_value=min_date.date(),
-                    max_value=max_date.date()
-                )
-            
-            # Time range selection
-            col3, col4 = st.sidebar.columns(2)
-            with col3:
-                start_time = st.time_input("Start Time", value=datetime.strptime("10:00", "%H:%M").time())
-            with col4:
-                end_time = st.time_input("End Time", value=datetime.strptime("18:00", "%H:%M").time())
+                    with col1:
+                        st.metric("🟢 Within ±5°C", int(green_count))
+                    with col2:
+                        st.metric("🟡 Within ±15°C", int(yellow_count))
+                    with col3:
+                        st.metric("🔴 Beyond ±15°C", int(red_count))
+                    with col4:
+                        total_beacons = len(max_temps)
+                        st.metric("📡 Total Beacons", total_beacons)
+                    
+                    # Add explanation
+                    st.info(f"""
+                    **Temperature Schematic Explanation:**
+                    - 🟢 **Green**: Beacons within ±5°C of target ({target_temp}°C)
+                    - 🟡 **Yellow**: Beacons within ±15°C of target ({target_temp}°C)  
+                    - 🔴 **Red**: Beacons more than ±15°C from target ({target_temp}°C)
+                    - Shows **maximum** temperature reached by each beacon in the selected time range
+                    """)
             
-            # Combine date and time early for use in smart selection
-            start_datetime = datetime.combine(start_date, start_time)
-            end_datetime = datetime.combine(end_date, end_time)
+            # Show data summary
+            with st.expander("📊 Data Summary"):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total Records", int(df['DataPoints'].sum()))
+                with col2:
+                    st.metric("Date Range", f"{len(df['DateTime'].dt.date.unique())} days")
+                with col3:
+                    st.metric("Beacons", groups.ngroups)
+                
+                st.dataframe(df.head())
             
-            # Time window selection
-            time_window = st.sidebar.selectbox(
-                "Time Window for Resampling",
-                options=['1min', '5min', '10min', '30min', '1H'],
-                index=1
-            )
+            # Create plots for each beacon
+            st.header("📈 Beacon Analysis")
             
-            # Beacon schematic options
-            st.sidebar.subheader("🌡️ Beacon Temperature Schematic")
-            show_schematic = st.sidebar.checkbox("Show Temperature Schematic", value=False)
+            plotted_beacons = [beacon for beacon in analysis_beacons if beacon in max_temps.index]
             
-            if show_schematic:
-                target_temp = st.sidebar.number_input(
-                    "Target Temperature (°C)",
-                    min_value=50,
-                    max_value=150,
-                    value=115,
-                    help="Reference temperature for color coding"
-                )
+            # Create interactive plots, a page of beacons at a time
+            show_beacon_plots(groups, plotted_beacons, analysis_window, (file_hash, analysis_start, analysis_end))
             
-            # Analysis button
-            if st.sidebar.button("🔍 Analyze Data", type="primary"):
-                if not selected_beacons:
-                    st.warning("Please select at least one beacon.")
-                    return
-                
-                # Get data
-                with st.spinner("Loading data from database..."):
-                    df = get_dataframe_from_database(
-                        db_path, 
-                        start_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-                        end_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-                        selected_beacons
-                    )
-                
-                if df.empty:
-                    st.warning("No data found for the selected criteria.")
-                    return
-                
-                # Display summary
-                st.success(f"✅ Found {len(df)} data points for {len(selected_beacons)} beacon(s)")
-                
-                # Show beacon temperature schematic if enabled
-                if show_schematic:
-                    st.header("🌡️ Beacon Temperature Schematic")
-                    
-                    with st.spinner("Creating temperature schematic..."):
-                        schematic_fig, error_msg = create_beacon_temperature_schematic(
-                            df, 
-                            start_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-                            end_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-                            target_temp
-                        )
-                    
-                    if error_msg:
-                        st.error(error_msg)
-                    elif schematic_fig:
-                        st.pyplot(schematic_fig)
-                        
-                        # Show beacon statistics summary
-                        st.subheader("📊 Schematic Summary")
-                        col1, col2, col3, col4 = st.columns(4)
-                        
-                        temp_data = df.groupby('BeaconDescription')['ExternalSensorTemperature'].max()
-                        temp_diffs = abs(temp_data - target_temp)
-                        
-                        with col1:
-                            green_count = len(temp_diffs[temp_diffs <= 5])
-                            st.metric("🟢 Within ±5°C", green_count)
-                        with col2:
-                            yellow_count = len(temp_diffs[(temp_diffs > 5) & (temp_diffs <= 15)])
-                            st.metric("🟡 Within ±15°C", yellow_count)
-                        with col3:
-                            red_count = len(temp_diffs[temp_diffs > 15])
-                            st.metric("🔴 Beyond ±15°C", red_count)
-                        with col4:
-                            total_beacons = len(temp_data)
-                            st.metric("📡 Total Beacons", total_beacons)
-                        
-                        # Add explanation
-                        st.info(f"""
-                        **Temperature Schematic Explanation:**
-                        - 🟢 **Green**: Beacons within ±5°C of target ({target_temp}°C)
-                        - 🟡 **Yellow**: Beacons within ±15°C of target ({target_temp}°C)  
-                        - 🔴 **Red**: Beacons more than ±15°C from target ({target_temp}°C)
-                        - Shows **maximum** temperature reached by each beacon in the selected time range
-                        """)
-                        
-                        plt.close(schematic_fig)  # Free up memory
-                
-                # Show data summary
-                with st.expander("📊 Data Summary"):
+            for beacon in plotted_beacons:
+                # Show beacon statistics
+                row = stats.loc[beacon]
+                with st.expander(f"Statistics for {beacon}"):
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Total Records", len(df))
+                        st.metric(
+                            "Avg Temperature", 
+                            f"{row['avg_temp']:.1f}°C"
+                        )
                     with col2:
-                        st.metric("Date Range", f"{len(df['DateTime'].dt.date.unique())} days")
+                        st.metric(
+                            "Avg RSSI", 
+                            f"{row['avg_rssi']:.1f} dBm"
+                        )
                     with col3:
-                        st.metric("Beacons", len(df['BeaconDescription'].unique()))
-                    
-                    st.dataframe(df.head())
-                
-                # Create plots for each beacon
-                st.header("📈 Beacon Analysis")
-                
-                for beacon in selected_beacons:
-                    beacon_df = df[df['BeaconDescription'] == beacon]
-                    if not beacon_df.empty:
-                        st.subheader(f"🎯 {beacon}")
-                        
-                        # Create interactive plot
-                        fig = create_interactive_plot(df, beacon, time_window)
-                        if fig:
-                            st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Show beacon statistics
-                        with st.expander(f"Statistics for {beacon}"):
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric(
-                                    "Avg Temperature", 
-                                    f"{beacon_df['ExternalSensorTemperature'].mean():.1f}°C"
-                                )
-                            with col2:
-                                st.metric(
-                                    "Avg RSSI", 
-                                    f"{beacon_df['RSSI'].mean():.1f} dBm"
-                                )
-                            with col3:
-                                st.metric(
-                                    "Data Points", 
-                                    len(beacon_df)
-                                )
-        
-        finally:
-            # Clean up temporary file
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+                        st.metric(
+                            "Data Points", 
+                            int(row['n'])
+                        )
     
     else:
         st.info("👆 Please upload your SQLite database file to get started!")
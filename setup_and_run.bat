@@ -1,6 +1,6 @@
 @echo off
 echo Installing required packages...
-python -m pip install streamlit plotly matplotlib pandas
+python -m pip install streamlit plotly plotly-resampler pandas
 
 echo.
 echo Starting Beacon Analyzer App...
@@ -1,6 +1,6 @@
 # Install required packages
 Write-Host "Installing required packages..." -ForegroundColor Green
-python -m pip install streamlit plotly matplotlib pandas
+python -m pip install streamlit plotly plotly-resampler pandas
 
 Write-Host ""
 Write-Host "Starting Beacon Analyzer App..." -ForegroundColor Green
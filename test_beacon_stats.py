@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-beacon statistics built from the bucketed query
+"""
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+# Import the functions from our main app
+import sys
+sys.path.append('.')
+
+# One beacon whose 10:00 bucket has one temperature and one RSSI missing,
+# followed by a complete 10:05 bucket
+NULL_READING_EVENTS = [
+    (1, '2024-01-01 10:00:00', 100.0, 100.0, -60.0),
+    (1, '2024-01-01 10:01:00', None, None, -70.0),
+    (1, '2024-01-01 10:02:00', 110.0, 110.0, None),
+    (1, '2024-01-01 10:05:00', 120.0, 120.0, -80.0),
+]
+
+# Two Beacon ids sharing one description, both reporting in the 10:00
+# bucket and again after a one hour gap
+SHARED_DESCRIPTION_EVENTS = [
+    (1, '2024-01-01 10:00:00', 100.0, 100.0, -60.0),
+    (2, '2024-01-01 10:01:00', 110.0, 110.0, -70.0),
+    (1, '2024-01-01 11:00:00', 120.0, 120.0, -80.0),
+    (2, '2024-01-01 11:01:00', 130.0, 130.0, -90.0),
+]
+
+def create_sample_database(db_path, beacons, events):
+    """Create a small beacon database from (Id, Description) and event tuples"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+    CREATE TABLE Beacon (Id INTEGER PRIMARY KEY, Description TEXT);
+    CREATE TABLE BeaconEvent (
+        Id INTEGER PRIMARY KEY,
+        BeaconId INTEGER,
+        DateTime TEXT,
+        ExternalSensorTemperature REAL,
+        ExternalSensorTemperatureExt1 REAL,
+        RSSI REAL
+    );
+    """)
+    conn.executemany("INSERT INTO Beacon VALUES (?, ?)", beacons)
+    conn.executemany(
+        "INSERT INTO BeaconEvent (BeaconId, DateTime, ExternalSensorTemperature, ExternalSensorTemperatureExt1, RSSI) VALUES (?, ?, ?, ?, ?)",
+        events
+    )
+    conn.commit()
+    conn.close()
+
+def load_sample_frame(beacons, events, file_hash):
+    """Run the bucketed data query over a temporary sample database"""
+    from beacon_analyzer_app import get_dataframe_from_database, remove_temp_database
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        create_sample_database(db_path, beacons, events)
+        return get_dataframe_from_database(
+            db_path,
+            file_hash,
+            datetime(2024, 1, 1, 10, 0, 0),
+            datetime(2024, 1, 1, 12, 0, 0),
+            ('Beacon_01',),
+            300
+        )
+    finally:
+        remove_temp_database(db_path)
+
+def test_beacon_stats_skip_null_readings():
+    """Averages match the plain mean of the non-NULL readings"""
+    from beacon_analyzer_app import summarize_beacons
+
+    df = load_sample_frame([(1, 'Beacon_01')], NULL_READING_EVENTS, 'test_beacon_stats_nulls')
+    row = summarize_beacons(df).loc['Beacon_01']
+
+    assert abs(row['avg_temp'] - 110.0) < 1e-6, row['avg_temp']
+    assert abs(row['avg_rssi'] - (-70.0)) < 1e-6, row['avg_rssi']
+    assert row['n'] == 4
+    assert row['max_temp'] == 120.0
+    print("✅ Beacon statistics ignore NULL readings")
+
+def test_shared_description_merges_into_one_series():
+    """Beacon ids sharing a description give one row per bucket and plot as one series"""
+    from beacon_analyzer_app import create_interactive_plot, summarize_beacons
+
+    df = load_sample_frame([(1, 'Beacon_01'), (2, 'Beacon_01')], SHARED_DESCRIPTION_EVENTS, 'test_beacon_stats_shared')
+
+    assert not df.duplicated(['DateTime', 'BeaconDescription']).any(), df
+    assert len(df) == 2, df
+    row = summarize_beacons(df).loc['Beacon_01']
+    assert abs(row['avg_temp'] - 115.0) < 1e-6, row['avg_temp']
+    assert row['n'] == 4
+
+    groups = df.groupby('BeaconDescription', sort=False, observed=True)
+    fig = create_interactive_plot(groups, ['Beacon_01'], '5min')
+    assert fig is not None
+    print("✅ Beacons sharing a description merge into one series")
+
+if __name__ == "__main__":
+    test_beacon_stats_skip_null_readings()
+    test_shared_description_merges_into_one_series()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script checking that the bucketed data query is served by the beacon index
+"""
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+# Import the functions from our main app
+import sys
+sys.path.append('.')
+
+def create_sample_database(db_path, n_beacons=33, n_events=20000):
+    """Create a beacon database with events spread over all beacons"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+    CREATE TABLE Beacon (Id INTEGER PRIMARY KEY, Description TEXT);
+    CREATE TABLE BeaconEvent (
+        Id INTEGER PRIMARY KEY,
+        BeaconId INTEGER,
+        DateTime TEXT,
+        ExternalSensorTemperature REAL,
+        ExternalSensorTemperatureExt1 REAL,
+        RSSI REAL
+    );
+    """)
+    conn.executemany(
+        "INSERT INTO Beacon VALUES (?, ?)",
+        [(i, f"Beacon_{i:02d}") for i in range(n_beacons)]
+    )
+    # One event every 5 seconds from 2024-01-01 00:00:00, cycling over the beacons
+    conn.executemany(
+        "INSERT INTO BeaconEvent (BeaconId, DateTime, ExternalSensorTemperature, ExternalSensorTemperatureExt1, RSSI) "
+        "VALUES (?, datetime(1704067200 + ?, 'unixepoch'), ?, ?, ?)",
+        [(i % n_beacons, i * 5, 100.0 + i % 20, 100.0, -70.0) for i in range(n_events)]
+    )
+    conn.commit()
+    conn.close()
+
+def test_bucket_query_uses_covering_index():
+    """The selected beacons' ranges are read from ix_be_bid_dt alone"""
+    from beacon_analyzer_app import add_query_indexes, build_bucket_query
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        create_sample_database(db_path)
+        add_query_indexes(db_path)
+
+        query, params = build_bucket_query(
+            datetime(2024, 1, 1, 0, 0, 0),
+            datetime(2024, 1, 1, 12, 0, 0),
+            ('Beacon_01', 'Beacon_02'),
+            300
+        )
+        conn = sqlite3.connect(db_path)
+        try:
+            plan = '\n'.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params))
+        finally:
+            conn.close()
+
+        assert 'COVERING INDEX ix_be_bid_dt' in plan, plan
+        print("✅ Bucket query uses the covering beacon index")
+    finally:
+        os.unlink(db_path)
+
+if __name__ == "__main__":
+    test_bucket_query_uses_covering_index()
@@ -4,7 +4,6 @@ Test script for the beacon temperature schematic function
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import numpy as np
 
@@ -19,9 +18,8 @@ def test_beacon_schematic():
     np.random.seed(42)
     beacons = [f"Beacon_{i:02d}" for i in range(1, 25)]  # 24 beacons
     
-    # Generate sample data over 2 days
+    # Generate 8 hours of sample data starting at 10:00
     start_time = datetime(2024, 1, 1, 10, 0, 0)
-    end_time = datetime(2024, 1, 1, 18, 0, 0)
     
     data = []
     for beacon in beacons:
@@ -49,19 +47,15 @@ def test_beacon_schematic():
     try:
         from beacon_analyzer_app import create_beacon_temperature_schematic
         
-        fig, error = create_beacon_temperature_schematic(
-            df, 
-            start_time.strftime('%Y-%m-%d %H:%M:%S'),
-            end_time.strftime('%Y-%m-%d %H:%M:%S'),
-            target_temp=115
-        )
+        max_temps = df.groupby('BeaconDescription')['ExternalSensorTemperature'].max()
+        fig, error = create_beacon_temperature_schematic(max_temps, target_temp=115)
         
         if error:
             print(f"Error: {error}")
             return False
         elif fig:
             print("✅ Schematic created successfully!")
-            plt.show()
+            fig.show()
             return True
         else:
             print("❌ No figure returned")
@@ -40,7 +40,7 @@ if __name__ == "__main__":
     print("=" * 50)
     
     # Test required modules
-    modules = ["streamlit", "pandas", "matplotlib", "plotly", "sqlite3", "tempfile", "os"]
+    modules = ["streamlit", "pandas", "plotly", "plotly_resampler", "sqlite3", "tempfile", "os"]
     all_good = True
     
     for module in modules:
@@ -60,4 +60,4 @@ if __name__ == "__main__":
         print("💡 You can now run: python -m streamlit run beacon_analyzer_app.py")
     else:
         print("⚠️  Some issues detected. Please install missing dependencies.")
-        print("💡 Run: python -m pip install streamlit plotly matplotlib pandas")
+        print("💡 Run: python -m pip install streamlit plotly plotly-resampler pandas")